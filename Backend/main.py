@@ -1,20 +1,26 @@
 import os
 from dotenv import load_dotenv
-from typing import TypedDict, List, Annotated, Dict, Any, Optional
-from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import TypedDict, List, Annotated, Dict, Any, Optional, Tuple
+from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import BaseTool, tool
-from langchain_core.pydantic_v1 import BaseModel as PydanticBaseModel, Field
-from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate
-from fastapi import FastAPI, HTTPException
+from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+from fastapi import FastAPI, HTTPException, Header, Body
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter
 import asyncio
 from contextlib import asynccontextmanager
 import logging
-import json
+import orjson
+import hashlib
+import time
+import uuid
+import numpy as np
+from cachetools import TTLCache
 
 # Load environment variables
 load_dotenv()
@@ -28,8 +34,17 @@ class RoleRequest(BaseModel):
     role_description: str
 
 class ClarificationResponse(BaseModel):
-    questions: List[str]
-    needs_clarification: bool
+    """Whether a role description needs clarification, and the questions to ask"""
+    questions: List[str] = Field(description="2-3 targeted questions for the missing details, empty if none are needed")
+    needs_clarification: bool = Field(description="True if crucial details are missing from the role description")
+
+class NumberedRoleAnalysis(ClarificationResponse):
+    """Analysis of one role in a numbered list of role descriptions"""
+    role_number: int = Field(description="Number of the role this analysis is for, as given in the list")
+
+class RoleAnalysisBatch(BaseModel):
+    """Role analyses for a numbered list of role descriptions"""
+    analyses: List[NumberedRoleAnalysis] = Field(description="Exactly one analysis per role")
 
 class ClarificationAnswers(BaseModel):
     answers: str
@@ -40,6 +55,20 @@ class HiringPlanResponse(BaseModel):
     interview_stages: List[Dict[str, Any]]
     final_plan_summary: str
 
+class PlanRequest(BaseModel):
+    role_description: Optional[str] = None
+    clarification_answers: Optional[str] = None
+    session_id: Optional[str] = None
+
+class PlanResponse(BaseModel):
+    session_id: str
+    needs_clarification: bool
+    questions: List[str]
+    job_description: Optional[str] = None
+    sourcing_channels: Optional[List[str]] = None
+    interview_stages: Optional[List[Dict[str, Any]]] = None
+    final_plan_summary: Optional[str] = None
+
 class HiringPlanState(TypedDict):
     initial_role_description: str
     clarified_role_details: str | None
@@ -49,26 +78,53 @@ class HiringPlanState(TypedDict):
     final_plan_summary: str | None
     messages: List
     needs_clarification: bool
+    clarification_questions: List[str] | None
     session_id: str | None
 
-class RoleAnalysisInput(PydanticBaseModel):
+# Structured output schemas for the LLM
+class InterviewStage(BaseModel):
+    """A single stage of the interview process"""
+    stage_name: str = Field(description="Name of the stage")
+    purpose: str = Field(description="What this stage aims to assess")
+    questions: List[str] = Field(description="Key sample questions for this stage")
+
+class HiringProcessDraft(BaseModel):
+    """Sourcing channels and interview process for a role"""
+    sourcing_channels: List[str] = Field(description="3-5 sourcing channels, each followed by why it suits the role")
+    interview_stages: List[InterviewStage] = Field(description="Interview stages in the order they happen")
+
+class HiringPlanDraft(BaseModel):
+    """Job description, sourcing channels and interview process for a role"""
+    job_description: str = Field(description="Complete job description in markdown")
+    sourcing_channels: List[str] = Field(description="3-5 sourcing channels, each followed by why it suits the role")
+    interview_stages: List[InterviewStage] = Field(description="Interview stages in the order they happen")
+
+class RolePlanDraft(BaseModel):
+    """Role analysis, plus the hiring plan when no clarification is needed"""
+    needs_clarification: bool = Field(description="True if crucial details are missing from the role description")
+    questions: List[str] = Field(description="2-3 targeted questions for the missing details, empty if none are needed")
+    job_description: Optional[str] = Field(default=None, description="Complete job description in markdown, omitted if clarification is needed")
+    sourcing_channels: Optional[List[str]] = Field(default=None, description="3-5 sourcing channels, each followed by why it suits the role, omitted if clarification is needed")
+    interview_stages: Optional[List[InterviewStage]] = Field(default=None, description="Interview stages in the order they happen, omitted if clarification is needed")
+
+class RoleAnalysisInput(BaseModel):
     """Input for role analysis tool"""
     role_description: str = Field(description="The initial role description to analyze")
 
-class JobDescriptionInput(PydanticBaseModel):
+class JobDescriptionInput(BaseModel):
     """Input for job description creation tool"""
     role_details: str = Field(description="Detailed role information for creating job description")
 
-class SourcingChannelsInput(PydanticBaseModel):
+class SourcingChannelsInput(BaseModel):
     """Input for sourcing channels suggestion tool"""
     role_details: str = Field(description="Role details to determine appropriate sourcing channels")
-    job_description: str = Field(description="Job description to help with channel selection")
+    job_description: str = Field(default="", description="Optional job description to help with channel selection")
 
-class InterviewProcessInput(PydanticBaseModel):
+class InterviewProcessInput(BaseModel):
     """Input for interview process design tool"""
     role_details: str = Field(description="Role details to design appropriate interview stages")
 
-class HiringPlanSummaryInput(PydanticBaseModel):
+class HiringPlanSummaryInput(BaseModel):
     """Input for hiring plan summary tool"""
     role_details: str = Field(description="Role details")
     job_description: str = Field(description="Complete job description")
@@ -124,12 +180,13 @@ def create_job_description(role_details: str) -> str:
     """
 
 @tool("suggest_sourcing_channels", args_schema=SourcingChannelsInput)
-def suggest_sourcing_channels(role_details: str, job_description: str) -> str:
+def suggest_sourcing_channels(role_details: str, job_description: str = "") -> str:
     """
     Suggest 3-5 diverse and effective sourcing channels for finding suitable candidates.
     """
+    job_description_text = f"Job Description: {job_description[:300]}..." if job_description else ""
     return f"""
-    Based on the role details and job description below, suggest 3-5 diverse and effective sourcing channels 
+    Based on the role details below, suggest 3-5 diverse and effective sourcing channels 
     for a startup to find suitable candidates. Consider a mix of common platforms (like LinkedIn, specialized job boards) 
     and niche communities if applicable.
 
@@ -137,7 +194,7 @@ def suggest_sourcing_channels(role_details: str, job_description: str) -> str:
 
     Role Details: {role_details}
 
-    Job Description: {job_description[:300]}...
+    {job_description_text}
 
     Format your response as a numbered list with explanations.
     """
@@ -211,45 +268,175 @@ def create_hiring_plan_summary(
     This plan provides a foundational structure. Remember to adapt it based on candidate flow and feedback.
     """
 
+# Tool registry, plus the schema listing served by /api/tools
+tools = [
+    analyze_role_for_clarification,
+    create_job_description,
+    suggest_sourcing_channels,
+    design_interview_process,
+    create_hiring_plan_summary
+]
+TOOL_INFO = {
+    "tools": [
+        {
+            "name": tool.name,
+            "description": tool.description,
+            "args_schema": tool.args_schema.model_json_schema() if tool.args_schema else None
+        }
+        for tool in tools
+    ]
+}
+# The listing never changes at runtime, so it is serialized once and served as raw bytes
+TOOL_INFO_JSON = orjson.dumps(TOOL_INFO)
+
+# Prompt templates, compiled once at import. The tools are pure prompt templates, so each
+# endpoint makes one structured call instead of going through an agent. Everything static
+# lives in the system message and the role details come last, so calls share a prompt
+# prefix Gemini can reuse
+ANALYSIS_INSTRUCTIONS = """You are an expert HR consultant. Based on the initial role description provided by the user, 
+    identify if crucial details are missing for creating a comprehensive hiring plan.
+    Missing details could include: specific responsibilities beyond general duties, required years of experience,
+    team structure (e.g., reporting line, team size), key success metrics for the role, or specific technologies.
+
+    If details are missing, formulate 2-3 targeted questions to ask the HR professional to get these details.
+    If the description seems reasonably complete for initial planning, no questions are needed."""
+
+JOB_DESCRIPTION_INSTRUCTIONS = """Job description - make it engaging and specific to attract the right candidates, and include:
+    - Job Title
+    - Company Overview
+    - Role Summary
+    - Key Responsibilities (5-7 bullet points)
+    - Required Qualifications
+    - Preferred Qualifications
+    - What We Offer
+    - Compensation Range (if applicable)"""
+
+HIRING_PROCESS_INSTRUCTIONS = """Sourcing channels - suggest 3-5 diverse and effective channels for a startup to find suitable 
+    candidates. Consider a mix of common platforms (like LinkedIn, specialized job boards) and niche 
+    communities if applicable. For each channel, briefly explain (1-2 sentences) why it is suitable 
+    for this specific role at a startup.
+
+    Interview stages - outline a typical multi-stage interview process suitable for hiring this role 
+    at a startup. For each stage, give its name, what it aims to assess, and 3 key sample questions."""
+
+PLAN_SECTIONS_INSTRUCTIONS = JOB_DESCRIPTION_INSTRUCTIONS + "\n\n    " + HIRING_PROCESS_INSTRUCTIONS
+
+PLAN_INSTRUCTIONS = """You are an expert HR consultant specializing in creating comprehensive hiring plans 
+    for startups. Be thorough and professional in your responses.
+
+    """
+
+ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", ANALYSIS_INSTRUCTIONS),
+    ("human", "Role description: {role_description}"),
+])
+
+BATCH_ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", ANALYSIS_INSTRUCTIONS + """
+
+    The user provides several numbered role descriptions. Analyze each one independently and 
+    return exactly one analysis per role, labelled with the role's number."""),
+    ("human", "{role_descriptions}"),
+])
+
+# The plan is drafted in two concurrent calls: the job description, which needs the stronger
+# model, and the sourcing and interview process, which is format-bound and goes to the fast one
+JOB_DESCRIPTION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", PLAN_INSTRUCTIONS + """Write the job description for the role described by the user, 
+    in markdown. Reply with the job description only.
+
+    """ + JOB_DESCRIPTION_INSTRUCTIONS),
+    ("human", "Role Details: {role_details}"),
+])
+
+HIRING_PROCESS_SYSTEM_PROMPT = PLAN_INSTRUCTIONS + """Design the sourcing and interview process 
+    for the role described by the user.
+
+    """ + HIRING_PROCESS_INSTRUCTIONS
+
+HIRING_PROCESS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", HIRING_PROCESS_SYSTEM_PROMPT),
+    ("human", "Role Details: {role_details}"),
+])
+
+# Tool call arguments arrive in one piece, so the streaming variant asks for
+# JSON text instead and parses it incrementally as tokens arrive
+HIRING_PROCESS_PARSER = JsonOutputParser(pydantic_object=HiringProcessDraft)
+HIRING_PROCESS_STREAM_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", HIRING_PROCESS_SYSTEM_PROMPT + "\n\n{format_instructions}"),
+    ("human", "Role Details: {role_details}"),
+]).partial(format_instructions=HIRING_PROCESS_PARSER.get_format_instructions())
+
+# Decide-then-proceed: analyze the role and, if it is complete enough, plan it in the same call
+ROLE_PLAN_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", ANALYSIS_INSTRUCTIONS + """
+
+    If no questions are needed, leave the questions empty and create a hiring plan for the role 
+    straight away. If questions are needed, leave the hiring plan fields empty.
+
+    """ + PLAN_SECTIONS_INSTRUCTIONS),
+    ("human", "Role description: {role_description}"),
+])
+
 # Global variables
 llm = None
-agent_executor = None
-tools = None
+llm_flash = None
+analysis_chain = None
+batch_analysis_chain = None
+job_description_chain = None
+hiring_process_chain = None
+hiring_process_stream_chain = None
+role_plan_chain = None
+embeddings = None
+hiring_plan_graph = None
+
+# Plan sessions are checkpointed here, so a session can pause for clarification and resume later
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.sqlite")
+
+# Caps concurrent Gemini requests so bursts queue locally instead of hitting quota errors
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+# The limit is for the whole server, so each worker process gets its share of it
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", min(4, os.cpu_count() or 1)))
+llm_semaphore = asyncio.Semaphore(max(1, GEMINI_MAX_CONCURRENCY // WEB_CONCURRENCY))
 
 async def initialize_llm_and_tools():
-    """Initialize the LLM and tools on startup"""
-    global llm, agent_executor, tools
+    """Initialize the LLM and the chains built on it on startup"""
+    global llm, llm_flash, analysis_chain, batch_analysis_chain, job_description_chain
+    global hiring_process_chain, hiring_process_stream_chain, role_plan_chain, embeddings
     try:
+        # System messages are sent as Gemini's native system_instruction rather than
+        # being folded into the first user turn
         llm = ChatGoogleGenerativeAI(
             model="gemini-1.5-pro-latest", 
-            temperature=0.7, 
-            convert_system_message_to_human=True
+            temperature=0.7
         )
+        # Sourcing channels and interview stages only need to follow the requested shape,
+        # so they go to the faster, cheaper model
+        llm_flash = ChatGoogleGenerativeAI(
+            model="gemini-1.5-flash",
+            temperature=0.5
+        )
+        # Build the gRPC async clients now, on the server's event loop, so the first request
+        # doesn't pay for them. The chains below bind these same instances and share their channels
+        llm.async_client
+        llm_flash.async_client
         
-        # Define tools
-        tools = [
-            analyze_role_for_clarification,
-            create_job_description,
-            suggest_sourcing_channels,
-            design_interview_process,
-            create_hiring_plan_summary
-        ]
-        
-        # Create agent prompt
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert HR consultant specializing in creating comprehensive hiring plans. 
-            You have access to specialized tools to help analyze roles, create job descriptions, suggest sourcing channels, 
-            design interview processes, and summarize hiring plans.
-            
-            Always use the appropriate tools to complete tasks. Be thorough and professional in your responses.
-            When using tools, make sure to extract and format the results appropriately for the user."""),
-            ("human", "{input}"),
-            ("placeholder", "{agent_scratchpad}"),
-        ])
+        analysis_chain = ANALYSIS_PROMPT | llm.with_structured_output(ClarificationResponse)
+        batch_analysis_chain = BATCH_ANALYSIS_PROMPT | llm.with_structured_output(RoleAnalysisBatch)
+        job_description_chain = JOB_DESCRIPTION_PROMPT | llm | StrOutputParser()
+        hiring_process_chain = HIRING_PROCESS_PROMPT | llm_flash.with_structured_output(HiringProcessDraft)
+        hiring_process_stream_chain = (
+            HIRING_PROCESS_STREAM_PROMPT
+            | llm_flash.bind(generation_config={"response_mime_type": "application/json"})
+            | HIRING_PROCESS_PARSER
+        )
+        role_plan_chain = ROLE_PLAN_PROMPT | llm.with_structured_output(RolePlanDraft)
         
-        # Create agent
-        agent = create_tool_calling_agent(llm, tools, prompt)
-        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+        if SEMANTIC_CACHE_ENABLED:
+            embeddings = GoogleGenerativeAIEmbeddings(
+                model="models/text-embedding-004",
+                task_type="SEMANTIC_SIMILARITY"
+            )
         
         logger.info("LLM and tools initialized successfully")
         
@@ -260,9 +447,12 @@ async def initialize_llm_and_tools():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle"""
+    global hiring_plan_graph
     # Startup
     await initialize_llm_and_tools()
-    yield
+    async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB_PATH) as checkpointer:
+        hiring_plan_graph = build_hiring_plan_graph().compile(checkpointer=checkpointer)
+        yield
     # Shutdown
     logger.info("Shutting down HR Agent API")
 
@@ -271,119 +461,600 @@ app = FastAPI(
     title="HR Hiring Plan Agent API",
     description="AI-powered HR assistant for creating comprehensive hiring plans using LangChain Tools",
     version="2.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Add CORS middleware
+# Origins allowed to call the API cross-origin, comma-separated. The built frontend is served
+# from this app, so this only matters for the Vite dev server or a separately hosted frontend
+FRONTEND_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("FRONTEND_ORIGIN", "http://localhost:5173").split(",")
+    if origin.strip()
+]
+
+class APICORSMiddleware:
+    """CORS for the API routes only, so static assets pass straight through"""
+    
+    def __init__(self, app, path_prefix: str = "/api", **options):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.cors = CORSMiddleware(app, **options)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.path_prefix):
+            await self.cors(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    APICORSMiddleware,
+    allow_origins=FRONTEND_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
 
-# Helper functions to parse tool outputs
-def parse_clarification_response(response: str) -> tuple[bool, List[str]]:
-    """Parse the clarification analysis response"""
-    questions = []
-    needs_clarification = False
+# Response cache for LLM calls, keyed by a hash of the prompt inputs
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+response_cache = TTLCache(maxsize=1024, ttl=RESPONSE_CACHE_TTL_SECONDS)
+# LLM calls currently running, so identical concurrent requests share one call
+inflight: Dict[str, asyncio.Future] = {}
+
+def make_cache_key(namespace: str, text: str) -> str:
+    """Build a response cache key from a namespace and the text sent to the LLM"""
+    digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    return f"{namespace}:{digest}"
+
+def finish_inflight(key: str, task: asyncio.Future):
+    """Cache a finished call's result and stop routing new requests to it"""
+    inflight.pop(key, None)
+    if not task.cancelled() and task.exception() is None:
+        response_cache[key] = task.result()
+
+async def get_or_compute(key: str, compute):
+    """Return the cached response for key, coalescing concurrent identical requests into one call"""
+    if key in response_cache:
+        return response_cache[key]
+    
+    task = inflight.get(key)
+    if task is None:
+        # Run the call as its own task so a disconnecting client doesn't cancel it for everyone else
+        task = asyncio.ensure_future(compute())
+        inflight[key] = task
+        task.add_done_callback(lambda finished: finish_inflight(key, finished))
+    return await asyncio.shield(task)
+
+class SemanticCache:
+    """
+    Fixed-size store of (embedding, response) pairs looked up by cosine similarity.
+    At this size an exact scan is a single matrix-vector product, so no ANN index is needed.
+    """
+    def __init__(self, maxsize: int, ttl: float, threshold: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.vectors: Optional[np.ndarray] = None
+        self.expires_at = np.zeros(maxsize)
+        self.values: List[Any] = [None] * maxsize
+        self.next_slot = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def get(self, embedding: List[float]) -> Any:
+        """Return the response cached for the most similar input, if it clears the threshold"""
+        if self.vectors is None:
+            return None
+        scores = self.vectors @ self._normalize(embedding)
+        # Empty and expired slots never match
+        scores[self.expires_at <= time.monotonic()] = -1.0
+        best = int(np.argmax(scores))
+        return self.values[best] if scores[best] >= self.threshold else None
+
+    def set(self, embedding: List[float], value: Any):
+        """Store a response, overwriting the oldest entry once full"""
+        vector = self._normalize(embedding)
+        if self.vectors is None:
+            self.vectors = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+        self.vectors[self.next_slot] = vector
+        self.values[self.next_slot] = value
+        self.expires_at[self.next_slot] = time.monotonic() + self.ttl
+        self.next_slot = (self.next_slot + 1) % self.maxsize
+
+# Semantic cache for near-identical inputs, e.g. "Senior Python Engineer" vs "Sr. Python Engineer"
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.93"))
+SEMANTIC_CACHE_TIMEOUT_SECONDS = float(os.getenv("SEMANTIC_CACHE_TIMEOUT_SECONDS", "2"))
+semantic_caches = {
+    namespace: SemanticCache(maxsize=1024, ttl=RESPONSE_CACHE_TTL_SECONDS, threshold=SEMANTIC_CACHE_THRESHOLD)
+    # Only role analyses: plans for roles that differ just in seniority, location or pay would
+    # clear the threshold too, so they are only ever reused for identical role details
+    for namespace in ("analyze",)
+}
+
+async def lookup_similar(namespace: str, text: str) -> Tuple[Any, Optional[List[float]]]:
+    """
+    Look up a response cached for a semantically similar input. Returns the response, or None,
+    and the embedding to store a freshly computed response under, or None if the lookup failed.
+    """
+    if not embeddings:
+        return None, None
+    try:
+        embedding = await asyncio.wait_for(embeddings.aembed_query(text), SEMANTIC_CACHE_TIMEOUT_SECONDS)
+    except Exception as e:
+        # The semantic cache is only an optimization, so fall back to exact matching
+        logger.warning(f"Skipping semantic cache lookup: {e!r}")
+        return None, None
+    return semantic_caches[namespace].get(embedding), embedding
+
+async def get_or_compute_similar(namespace: str, text: str, compute):
+    """Like get_or_compute, but also reuse a response cached for a semantically similar input"""
+    key = make_cache_key(namespace, text)
+    if not embeddings:
+        return await get_or_compute(key, compute)
+    
+    async def compute_unless_similar():
+        cached, embedding = await lookup_similar(namespace, text)
+        if cached is not None:
+            return cached
+        result = await compute()
+        if embedding is not None:
+            semantic_caches[namespace].set(embedding, result)
+        return result
+    
+    # The lookup runs inside the coalesced call, so identical concurrent requests embed the text once
+    return await get_or_compute(key, compute_unless_similar)
+
+# Hiring plan helpers
+PLAN_SECTIONS = ["job_description", "sourcing_channels", "interview_stages"]
+# Sections drafted by the hiring process call
+HIRING_PROCESS_SECTIONS = ["sourcing_channels", "interview_stages"]
+# Streamed event name for each item of the list sections
+PLAN_ITEM_EVENTS = {"sourcing_channels": "sourcing_channel", "interview_stages": "interview_stage"}
+# Streamed items are validated against these before they are sent, as the raw JSON may not fit the schema
+PLAN_ITEM_SCHEMAS = {"sourcing_channels": TypeAdapter(str), "interview_stages": TypeAdapter(InterviewStage)}
+
+def validate_plan_item(section: str, item: Any) -> Any:
+    """Validate a streamed list item and return it in the shape of the response schema"""
+    schema = PLAN_ITEM_SCHEMAS[section]
+    return schema.dump_python(schema.validate_python(item))
+
+def build_hiring_plan_response(role_details: str, plan: HiringPlanDraft) -> HiringPlanResponse:
+    """Assemble the API response, rendering the summary from the generated sections"""
+    interview_stages = [stage.model_dump() for stage in plan.interview_stages]
+    
+    # The summary tool is a pure template, so render it directly without the tool-run overhead
+    final_plan_summary = create_hiring_plan_summary.func(
+        role_details=role_details,
+        job_description=plan.job_description,
+        sourcing_channels=plan.sourcing_channels,
+        interview_stages=interview_stages
+    )
+    
+    return HiringPlanResponse(
+        job_description=plan.job_description,
+        sourcing_channels=plan.sourcing_channels,
+        interview_stages=interview_stages,
+        final_plan_summary=final_plan_summary
+    )
+
+async def invoke_limited(chain, inputs: Dict[str, Any]) -> Any:
+    """Invoke a chain within the Gemini concurrency limit"""
+    async with llm_semaphore:
+        return await chain.ainvoke(inputs)
+
+async def astream_limited(chain, inputs: Dict[str, Any]):
+    """Stream a chain within the Gemini concurrency limit"""
+    async with llm_semaphore:
+        async for chunk in chain.astream(inputs):
+            yield chunk
+
+async def merge_streams(streams: Dict[str, Any]):
+    """
+    Consume several async streams concurrently, yielding (name, chunk) pairs as chunks arrive
+    and (name, None) once a stream is exhausted. The first failure cancels the other streams.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def pump(name: str, stream):
+        try:
+            async for chunk in stream:
+                await queue.put((name, chunk, None))
+            await queue.put((name, None, None))
+        except Exception as e:
+            await queue.put((name, None, e))
+    
+    tasks = [asyncio.create_task(pump(name, stream)) for name, stream in streams.items()]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            name, chunk, error = await queue.get()
+            if error is not None:
+                raise error
+            if chunk is None:
+                remaining -= 1
+            yield name, chunk
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def generate_job_description(role_details: str) -> str:
+    """Generate the job description in a cached call"""
+    async def generate():
+        job_description = await invoke_limited(job_description_chain, {"role_details": role_details})
+        if not job_description:
+            raise ValueError("The model did not return a job description")
+        return job_description
+    
+    return await get_or_compute(make_cache_key("job_description", role_details), generate)
+
+async def generate_hiring_process(role_details: str) -> HiringProcessDraft:
+    """Generate the sourcing channels and interview process in a cached call"""
+    async def generate():
+        process = await invoke_limited(hiring_process_chain, {"role_details": role_details})
+        if process is None:
+            raise ValueError("The model did not return a sourcing and interview process")
+        return process
+    
+    return await get_or_compute(make_cache_key("hiring_process", role_details), generate)
+
+async def generate_hiring_plan(role_details: str) -> HiringPlanDraft:
+    """Generate the job description and, concurrently, the sourcing and interview process, cached as one plan"""
+    async def generate():
+        job_description, process = await asyncio.gather(
+            generate_job_description(role_details),
+            generate_hiring_process(role_details)
+        )
+        return HiringPlanDraft(
+            job_description=job_description,
+            sourcing_channels=process.sourcing_channels,
+            interview_stages=process.interview_stages
+        )
+    
+    return await get_or_compute(make_cache_key("plan", role_details), generate)
+
+def format_sse(event: str, data: Any) -> bytes:
+    """Format a server-sent event with a JSON payload"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+class PlanStream:
+    """
+    A hiring plan streamed by a background task. Its events are fanned out to every subscriber and
+    replayed to ones that join late, so a client that disconnects only drops its own subscription.
+    """
+    def __init__(self):
+        self.events: List[Optional[bytes]] = []
+        self.subscribers: set = set()
+
+    def publish(self, event: Optional[bytes]):
+        """Send an event to every subscriber; None marks the end of the stream"""
+        self.events.append(event)
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in self.events:
+            queue.put_nowait(event)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+# Hiring plans currently being streamed, by cache key; their tasks are also registered in inflight
+plan_streams: Dict[str, PlanStream] = {}
+
+def plan_section_events(section: str, value: Any) -> List[bytes]:
+    """Events for a complete section: one per item for the list sections, then the section itself"""
+    events = []
+    if section in PLAN_ITEM_EVENTS:
+        events.extend(format_sse(PLAN_ITEM_EVENTS[section], item) for item in value)
+    events.append(format_sse(section, value))
+    return events
+
+async def generate_streamed_hiring_plan(role_details: str, plan_stream: PlanStream) -> HiringPlanDraft:
+    """
+    Generate a hiring plan, publishing job description tokens, individual sourcing channels and
+    interview stages as they are generated, and each section once it is complete
+    """
+    sent_sections = set()
+    sent_items = {section: 0 for section in PLAN_ITEM_EVENTS}
+    
+    def publish_items(section: str, items: List[Any], section_complete: bool):
+        """Publish the list items that can't change any more"""
+        # Until the section is complete, its last item may still be growing
+        ready = len(items) if section_complete else len(items) - 1
+        for item in items[sent_items[section]:ready]:
+            # An item that doesn't fit the schema fails the stream now, before clients render it
+            plan_stream.publish(format_sse(PLAN_ITEM_EVENTS[section], validate_plan_item(section, item)))
+        sent_items[section] = max(sent_items[section], ready)
     
-    if "CLARIFICATION_NEEDED:" in response:
-        needs_clarification = True
-        questions_text = response.split("CLARIFICATION_NEEDED:")[1].strip()
-        # Parse questions from the text
-        lines = questions_text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line and (line.startswith(('1.', '2.', '3.', '-', '•')) or '?' in line):
-                # Clean up the question
-                question = line.lstrip('123.-•').strip()
-                if question and '?' in question:
-                    questions.append(question)
+    def publish_process(partial: Dict[str, Any], stream_complete: bool):
+        """Publish the sourcing and interview sections and items that are complete"""
+        # JSON mode doesn't fix the key order, so go by the order keys appear in the output:
+        # a section is complete once the model has started any key after it
+        written = list(partial)
+        for index, section in enumerate(written):
+            if section not in HIRING_PROCESS_SECTIONS or section in sent_sections:
+                continue
+            section_complete = stream_complete or index + 1 < len(written)
+            
+            if not isinstance(partial[section], list):
+                raise ValueError(f"The model returned an invalid {section} section")
+            publish_items(section, partial[section], section_complete)
+            if section_complete:
+                items = [validate_plan_item(section, item) for item in partial[section]]
+                plan_stream.publish(format_sse(section, items))
+                sent_sections.add(section)
     
-    return needs_clarification, questions
+    try:
+        inputs = {"role_details": role_details}
+        job_description = ""
+        partial: Dict[str, Any] = {}
+        process = None
+        async for name, chunk in merge_streams({
+            "job_description": astream_limited(job_description_chain, inputs),
+            "hiring_process": astream_limited(hiring_process_stream_chain, inputs)
+        }):
+            if name == "job_description":
+                if chunk is None:
+                    if not job_description:
+                        raise ValueError("The model did not return a job description")
+                    plan_stream.publish(format_sse("job_description", job_description))
+                elif chunk:
+                    # Forward job description tokens as they are generated
+                    plan_stream.publish(format_sse("job_description_delta", chunk))
+                    job_description += chunk
+            elif chunk is None:
+                process = HiringProcessDraft.model_validate(partial)
+                publish_process(process.model_dump(), True)
+            else:
+                partial = chunk
+                publish_process(partial, False)
+        
+        return HiringPlanDraft(
+            job_description=job_description,
+            sourcing_channels=process.sourcing_channels,
+            interview_stages=process.interview_stages
+        )
+    finally:
+        plan_stream.publish(None)
 
-def parse_interview_stages(response: str) -> List[Dict[str, Any]]:
-    """Parse interview stages from tool response"""
-    stages = []
+def start_streamed_hiring_plan(key: str, role_details: str) -> asyncio.Future:
+    """Start streaming a plan in the background, registered as the in-flight call for key"""
+    plan_stream = PlanStream()
+    plan_streams[key] = plan_stream
+    # Run the generation as its own task so a disconnecting client doesn't cancel it for everyone else
+    task = asyncio.ensure_future(generate_streamed_hiring_plan(role_details, plan_stream))
+    inflight[key] = task
     
-    # Split by STAGE NAME:
-    stage_segments = response.split("STAGE NAME:")
+    def finish(finished: asyncio.Future):
+        plan_streams.pop(key, None)
+        finish_inflight(key, finished)
     
-    for segment in stage_segments[1:]:  # Skip first empty segment
-        stage_data = {"stage_name": "", "purpose": "", "questions": []}
-        lines = [line.strip() for line in segment.split('\n') if line.strip()]
+    task.add_done_callback(finish)
+    return task
+
+async def stream_hiring_plan(role_details: str):
+    """
+    Yield the hiring plan as server-sent events, as soon as each part is generated.
+    Uses the same caches and in-flight calls as generate_hiring_plan.
+    """
+    try:
+        key = make_cache_key("plan", role_details)
+        plan = response_cache.get(key)
+        if plan is None and key in inflight and key not in plan_streams:
+            # An identical plan is already being generated without streaming, so wait for it
+            plan = await asyncio.shield(inflight[key])
         
-        if not lines:
-            continue
+        if plan is None:
+            task = inflight[key] if key in plan_streams else start_streamed_hiring_plan(key, role_details)
+            plan_stream = plan_streams[key]
+            queue = plan_stream.subscribe()
+            try:
+                while (event := await queue.get()) is not None:
+                    yield event
+            finally:
+                plan_stream.unsubscribe(queue)
+            plan = await asyncio.shield(task)
             
-        # First line is the stage name
-        stage_data["stage_name"] = lines[0].strip()
+            response = build_hiring_plan_response(role_details, plan)
+        else:
+            response = build_hiring_plan_response(role_details, plan)
+            for section in PLAN_SECTIONS:
+                for event in plan_section_events(section, getattr(response, section)):
+                    yield event
+        yield format_sse("final_plan_summary", response.final_plan_summary)
         
-        # Parse purpose and questions
-        parsing_questions = False
-        for line in lines[1:]:
-            if line.startswith("PURPOSE:"):
-                stage_data["purpose"] = line.replace("PURPOSE:", "").strip()
-                parsing_questions = False
-            elif line.startswith("KEY SAMPLE QUESTIONS:"):
-                parsing_questions = True
-            elif parsing_questions and line.startswith("-"):
-                question = line.lstrip("- ").strip()
-                if question:
-                    stage_data["questions"].append(question)
+    except Exception as e:
+        logger.error(f"Error in stream_hiring_plan: {e}")
+        yield format_sse("error", str(e))
+
+async def analyze_and_plan_role(role_description: str) -> Tuple[RolePlanDraft, Optional[HiringPlanDraft]]:
+    """
+    Analyze the role and, if no clarification is needed, draft its plan in the same cached call.
+    Returns the analysis and the plan, which is None when clarification is needed.
+    """
+    async def analyze_and_plan():
+        async with llm_semaphore:
+            role_plan = await role_plan_chain.ainvoke({"role_description": role_description})
+        if role_plan is None:
+            raise ValueError("The model did not return a role analysis")
+        if role_plan.needs_clarification:
+            return role_plan, None
         
-        if stage_data["stage_name"]:
-            stages.append(stage_data)
+        # Validate before returning, so an incomplete draft is never cached
+        if role_plan.job_description is None or role_plan.sourcing_channels is None or role_plan.interview_stages is None:
+            raise ValueError("The model did not return a hiring plan")
+        plan = HiringPlanDraft(
+            job_description=role_plan.job_description,
+            sourcing_channels=role_plan.sourcing_channels,
+            interview_stages=role_plan.interview_stages
+        )
+        return role_plan, plan
     
-    return stages
+    return await get_or_compute(make_cache_key("role_plan", role_description), analyze_and_plan)
 
-def parse_sourcing_channels(response: str) -> List[str]:
-    """Parse sourcing channels from tool response"""
-    channels = []
-    lines = response.split('\n')
+def plan_state_update(plan: HiringPlanDraft) -> Dict[str, Any]:
+    """Graph state update holding a drafted plan, as plain data the checkpointer can store"""
+    return {
+        "job_description": plan.job_description,
+        "sourcing_channels": plan.sourcing_channels,
+        "interview_stages": [stage.model_dump() for stage in plan.interview_stages]
+    }
+
+# Hiring plan graph: analyze -> (pause for clarification | summary), or once answers arrive
+# plan -> (draft_job_description, draft_hiring_process) in parallel -> summary
+async def analyze_node(state: HiringPlanState) -> Dict[str, Any]:
+    """Ask for clarification, or take the plan drafted together with the analysis"""
+    role_plan, plan = await analyze_and_plan_role(state["initial_role_description"])
+    if plan is None:
+        return {"needs_clarification": True, "clarification_questions": role_plan.questions}
     
-    for line in lines:
-        line = line.strip()
-        if line and (line.startswith(('1.', '2.', '3.', '4.', '5.', '-', '•'))):
-            # Extract the channel info
-            channel = line.lstrip('12345.-•').strip()
-            if channel:
-                channels.append(channel)
+    return {"needs_clarification": False, "clarification_questions": [], **plan_state_update(plan)}
+
+def plan_node(state: HiringPlanState) -> Dict[str, Any]:
+    """Start drafting the plan from the role description and the clarification answers"""
+    return {"needs_clarification": False, "clarification_questions": []}
+
+async def job_description_node(state: HiringPlanState) -> Dict[str, Any]:
+    """Draft the job description"""
+    return {"job_description": await generate_job_description(state["clarified_role_details"])}
+
+async def hiring_process_node(state: HiringPlanState) -> Dict[str, Any]:
+    """Draft the sourcing channels and interview process"""
+    process = await generate_hiring_process(state["clarified_role_details"])
+    return {
+        "sourcing_channels": process.sourcing_channels,
+        "interview_stages": [stage.model_dump() for stage in process.interview_stages]
+    }
+
+def summary_node(state: HiringPlanState) -> Dict[str, Any]:
+    """Render the final summary from the drafted sections"""
+    final_plan_summary = create_hiring_plan_summary.func(
+        role_details=state["clarified_role_details"] or state["initial_role_description"],
+        job_description=state["job_description"],
+        sourcing_channels=state["sourcing_channels"],
+        interview_stages=state["interview_stages"]
+    )
+    return {"final_plan_summary": final_plan_summary}
+
+def build_hiring_plan_graph() -> StateGraph:
+    """Build the hiring plan workflow; it is compiled with a checkpointer at startup"""
+    builder = StateGraph(HiringPlanState)
+    builder.add_node("analyze", analyze_node)
+    builder.add_node("plan", plan_node)
+    builder.add_node("draft_job_description", job_description_node)
+    builder.add_node("draft_hiring_process", hiring_process_node)
+    builder.add_node("summary", summary_node)
     
-    return channels if channels else [response]  # Fallback to full response
+    builder.add_conditional_edges(
+        START,
+        lambda state: "plan" if state["clarified_role_details"] else "analyze",
+        ["analyze", "plan"]
+    )
+    # The run ends at analyze when clarification is needed; the next request on the session resumes at plan
+    builder.add_conditional_edges(
+        "analyze",
+        lambda state: END if state["needs_clarification"] else "summary",
+        ["summary", END]
+    )
+    # Each branch is checkpointed as it finishes, so a failed run resumes with only the other branch
+    builder.add_edge("plan", "draft_job_description")
+    builder.add_edge("plan", "draft_hiring_process")
+    builder.add_edge(["draft_job_description", "draft_hiring_process"], "summary")
+    builder.add_edge("summary", END)
+    return builder
 
 # API Endpoints
 @app.post("/api/analyze-role", response_model=ClarificationResponse)
 async def analyze_role(request: RoleRequest):
     """Analyze the initial role description and determine if clarification is needed."""
     try:
-        if not agent_executor:
+        if not analysis_chain:
             raise HTTPException(status_code=500, detail="Service not initialized")
         
-        # Use the agent to analyze the role
-        result = await agent_executor.ainvoke({
-            "input": f"Please analyze this role description for missing details that would be crucial for creating a comprehensive hiring plan: {request.role_description}"
-        })
-        
-        response_text = result.get("output", "")
-        needs_clarification, questions = parse_clarification_response(response_text)
+        async def analyze():
+            async with llm_semaphore:
+                analysis = await analysis_chain.ainvoke({"role_description": request.role_description})
+            if analysis is None:
+                raise ValueError("The model did not return a role analysis")
+            return analysis
         
-        return ClarificationResponse(
-            questions=questions,
-            needs_clarification=needs_clarification
-        )
+        return await get_or_compute_similar("analyze", request.role_description, analyze)
         
     except Exception as e:
         logger.error(f"Error in analyze_role: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Every role in a batch goes into one prompt, so larger lists are rejected rather than sent as one huge call
+MAX_BATCH_ROLES = int(os.getenv("MAX_BATCH_ROLES", "20"))
+
+@app.post("/api/analyze-roles", response_model=List[ClarificationResponse])
+async def analyze_roles(requests: Annotated[List[RoleRequest], Body(max_length=MAX_BATCH_ROLES)]):
+    """Analyze several role descriptions with a single LLM call, returning one analysis per role in order."""
+    try:
+        if not batch_analysis_chain:
+            raise HTTPException(status_code=500, detail="Service not initialized")
+        
+        keys = [make_cache_key("analyze", request.role_description) for request in requests]
+        
+        # Take the cached analyses now, since they can expire or be evicted while the batch call runs
+        cached: Dict[str, ClarificationResponse] = {
+            key: analysis for key in keys if (analysis := response_cache.get(key)) is not None
+        }
+        
+        # Only send roles that aren't cached, each distinct description once
+        pending: Dict[str, str] = {}
+        for key, request in zip(keys, requests):
+            if key not in cached:
+                pending[key] = request.role_description
+        
+        analyses: Dict[str, ClarificationResponse] = {}
+        if pending:
+            role_descriptions = "\n\n".join(
+                f"Role {number}: {description}"
+                for number, description in enumerate(pending.values(), start=1)
+            )
+            async with llm_semaphore:
+                batch = await batch_analysis_chain.ainvoke({"role_descriptions": role_descriptions})
+            # Match analyses to roles by number, not position, and reject anything but exactly 1..N
+            role_numbers = sorted(analysis.role_number for analysis in batch.analyses) if batch else []
+            if role_numbers != list(range(1, len(pending) + 1)):
+                raise ValueError("The model did not return one analysis per role")
+            
+            by_number = {
+                analysis.role_number: ClarificationResponse(
+                    questions=analysis.questions,
+                    needs_clarification=analysis.needs_clarification
+                )
+                for analysis in batch.analyses
+            }
+            analyses = {key: by_number[number] for number, key in enumerate(pending, start=1)}
+            response_cache.update(analyses)
+        
+        return [analyses[key] if key in analyses else cached[key] for key in keys]
+        
+    except Exception as e:
+        logger.error(f"Error in analyze_roles: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/create-hiring-plan", response_model=HiringPlanResponse)
-async def create_hiring_plan(request: RoleRequest, clarification_answers: Optional[str] = None):
-    """Create a complete hiring plan based on role description and optional clarification answers."""
+async def create_hiring_plan(
+    request: RoleRequest,
+    clarification_answers: Optional[str] = None,
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Create a complete hiring plan based on role description and optional clarification answers.
+    Send `Accept: text/event-stream` to receive each section as a server-sent event as soon as it is ready.
+    """
     try:
-        if not agent_executor:
+        if not job_description_chain or not hiring_process_chain:
             raise HTTPException(status_code=500, detail="Service not initialized")
         
         # Prepare role details
@@ -391,41 +1062,90 @@ async def create_hiring_plan(request: RoleRequest, clarification_answers: Option
         if clarification_answers:
             role_details += f"\n\nAdditional Details:\n{clarification_answers}"
         
-        # Step 1: Create job description
-        jd_result = await agent_executor.ainvoke({
-            "input": f"Create a comprehensive job description for this role: {role_details}"
-        })
-        job_description = jd_result.get("output", "")
+        if accept and "text/event-stream" in accept:
+            return StreamingResponse(stream_hiring_plan(role_details), media_type="text/event-stream")
         
-        # Step 2: Suggest sourcing channels
-        sourcing_result = await agent_executor.ainvoke({
-            "input": f"Suggest sourcing channels for this role: {role_details}\n\nJob Description: {job_description[:300]}..."
-        })
-        sourcing_response = sourcing_result.get("output", "")
-        sourcing_channels = parse_sourcing_channels(sourcing_response)
+        # Steps 1-3: Job description on the pro model, sourcing channels and interview process concurrently on flash
+        plan = await generate_hiring_plan(role_details)
         
-        # Step 3: Design interview process
-        interview_result = await agent_executor.ainvoke({
-            "input": f"Design an interview process for this role: {role_details}"
-        })
-        interview_response = interview_result.get("output", "")
-        interview_stages = parse_interview_stages(interview_response)
+        # Step 4: Summary
+        return build_hiring_plan_response(role_details, plan)
         
-        # Step 4: Create summary
-        summary_result = await agent_executor.ainvoke({
-            "input": f"Create a comprehensive hiring plan summary with these components:\nRole: {role_details}\nJob Description: {job_description}\nSourcing Channels: {sourcing_channels}\nInterview Stages: {interview_stages}"
-        })
-        final_plan_summary = summary_result.get("output", "")
+    except Exception as e:
+        logger.error(f"Error in create_hiring_plan: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/plan", response_model=PlanResponse)
+async def plan_role(request: PlanRequest):
+    """
+    Analyze the role and create the hiring plan in a single round-trip.
+    Without clarification answers, the model either asks its questions or, if the description is complete
+    enough, returns the plan straight away. To answer, send the clarification answers with the returned
+    session_id; the role description is then taken from the session if omitted.
+    """
+    try:
+        if not hiring_plan_graph:
+            raise HTTPException(status_code=500, detail="Service not initialized")
         
-        return HiringPlanResponse(
-            job_description=job_description,
-            sourcing_channels=sourcing_channels,
-            interview_stages=interview_stages,
-            final_plan_summary=final_plan_summary
+        session_id = request.session_id or str(uuid.uuid4())
+        config = {"configurable": {"thread_id": session_id}}
+        
+        snapshot = await hiring_plan_graph.aget_state(config) if request.session_id else None
+        session = snapshot.values if snapshot is not None else {}
+        
+        role_description = request.role_description
+        if role_description is None:
+            role_description = session.get("initial_role_description")
+            if role_description is None:
+                raise HTTPException(status_code=400, detail="role_description is required for a new session")
+        
+        role_details = None
+        if request.clarification_answers:
+            role_details = f"{role_description}\n\nAdditional Details:\n{request.clarification_answers}"
+        
+        if (
+            snapshot is not None and snapshot.next
+            and session.get("initial_role_description") == role_description
+            and session.get("clarified_role_details") == role_details
+        ):
+            # An earlier run of this same request failed partway; resume it so finished branches aren't redone
+            state = await hiring_plan_graph.ainvoke(None, config)
+        else:
+            # Reset every output so nothing from an earlier run on this session leaks into the response
+            state = await hiring_plan_graph.ainvoke({
+                "initial_role_description": role_description,
+                "clarified_role_details": role_details,
+                "job_description": None,
+                "sourcing_channels": None,
+                "interview_stages": None,
+                "final_plan_summary": None,
+                "messages": [],
+                "needs_clarification": False,
+                "clarification_questions": None,
+                "session_id": session_id
+            }, config)
+        
+        if state["needs_clarification"]:
+            return PlanResponse(
+                session_id=session_id,
+                needs_clarification=True,
+                questions=state["clarification_questions"]
+            )
+        
+        return PlanResponse(
+            session_id=session_id,
+            needs_clarification=False,
+            questions=[],
+            job_description=state["job_description"],
+            sourcing_channels=state["sourcing_channels"],
+            interview_stages=state["interview_stages"],
+            final_plan_summary=state["final_plan_summary"]
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error in create_hiring_plan: {e}")
+        logger.error(f"Error in plan_role: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/health")
@@ -435,35 +1155,48 @@ async def health_check():
         "status": "healthy",
         "service": "HR Hiring Plan Agent API with LangChain Tools",
         "llm_initialized": llm is not None,
-        "agent_executor_initialized": agent_executor is not None,
+        "analysis_chain_initialized": analysis_chain is not None,
+        "plan_chain_initialized": job_description_chain is not None and hiring_process_chain is not None,
+        "hiring_plan_graph_initialized": hiring_plan_graph is not None,
         "tools_count": len(tools) if tools else 0
     }
 
 @app.get("/api/tools")
 async def list_tools():
     """List available tools."""
-    if not tools:
-        return {"tools": []}
-    
-    tool_info = []
-    for tool in tools:
-        tool_info.append({
-            "name": tool.name,
-            "description": tool.description,
-            "args_schema": tool.args_schema.schema() if tool.args_schema else None
-        })
-    
-    return {"tools": tool_info}
+    return Response(content=TOOL_INFO_JSON, media_type="application/json")
 
-from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
-@app.get("/")
-def read_root():
-    return FileResponse('dist/index.html')
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that sends a fixed Cache-Control header with every file it serves"""
+    def __init__(self, *args, cache_control: str, **kwargs):
+        self.cache_control = cache_control
+        super().__init__(*args, **kwargs)
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
 
-app.mount("/assets", StaticFiles(directory="dist/assets"), name = "assets")
+# Build assets have content-hashed names, so browsers can keep them forever. The SPA shell
+# must be revalidated on every load, which StaticFiles answers with a 304 via its ETag
+app.mount("/assets", CachedStaticFiles(directory="dist/assets", cache_control="public, max-age=31536000, immutable"), name = "assets")
+app.mount("/", CachedStaticFiles(directory="dist", html=True, cache_control="no-cache"), name = "spa")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
+    # Multiple workers need an import string. Each worker runs its own lifespan, so the LLM and
+    # response cache are per process, and each takes its share of the Gemini concurrency limit.
+    # loop="auto" picks uvloop when it is installed (it isn't available on Windows) and falls
+    # back to asyncio otherwise
+    uvicorn.run(
+        "main:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host="0.0.0.0",
+        port=8000,
+        workers=WEB_CONCURRENCY,
+        loop="auto",
+        http="httptools",
+        log_level="info"
+    )
\ No newline at end of file